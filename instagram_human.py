@@ -20,13 +20,18 @@ Instagram Human-Like Bot
 """
 
 import asyncio
+import collections
 import random
 import math
 import os
+import re
 from datetime import datetime
 from typing import Optional, Literal
 from dataclasses import dataclass
-from playwright.async_api import async_playwright, Page, BrowserContext
+from urllib.parse import urlparse
+import numpy as np
+from playwright.async_api import async_playwright, Page, BrowserContext, CDPSession
+from playwright.async_api import Error as PlaywrightError
 
 
 # =============================================================================
@@ -57,6 +62,7 @@ class InstagramConfig:
     # Действия по умолчанию
     auto_like: bool = True
     auto_follow: bool = False  # Осторожно с массовыми подписками!
+    like_timeout: float = 15.0  # Сек. на попытку лайка, чтобы не висеть на зависшем селекторе
     
     # Браузер
     headless: bool = False
@@ -72,23 +78,53 @@ class InstagramConfig:
     screenshots_dir: str = "./screenshots"
 
 
+# Эмулируемое устройство
+DEVICE_NAME = 'iPhone 14 Pro Max'
+
+# Init-скрипт собран один раз при импорте
+_INIT_JS = "(() => {Object.defineProperty(navigator, 'webdriver', {get: () => undefined});Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3]});})();"
+
+
 # =============================================================================
 # Утилиты
 # =============================================================================
 
+_rng = np.random.default_rng()
+
+# Тип URL: group(1) — 'reel' / 'p', None — профиль
+_URL_RE = re.compile(r"instagram\.com/(?:[^?#]*?/)?((?-i:reel|p))/|instagram\.com/", re.IGNORECASE)
+
+# Буфер стандартных нормальных величин (пополняется пачками)
+_DELAY_BATCH = 1024
+_delay_buf: collections.deque = collections.deque()
+
+
+# Каталоги, уже созданные в этом процессе
+_ENSURED_DIRS: set = set()
+
+
+def ensure_dir(path: str):
+    """os.makedirs один раз на путь за процесс"""
+    if path not in _ENSURED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+
 def random_delay(min_sec: float, max_sec: float) -> float:
     """Случайная задержка с нормальным распределением"""
+    if not _delay_buf:
+        _delay_buf.extend(_rng.standard_normal(_DELAY_BATCH).tolist())
     mean = (min_sec + max_sec) / 2
     std = (max_sec - min_sec) / 4
-    delay = random.gauss(mean, std)
+    delay = mean + std * _delay_buf.popleft()
     return max(min_sec, min(max_sec, delay))
 
 
-def bezier_point(p0: tuple, p1: tuple, p2: tuple, p3: tuple, t: float) -> tuple:
-    """Точка на кубической кривой Безье"""
-    x = (1-t)**3 * p0[0] + 3*(1-t)**2 * t * p1[0] + 3*(1-t) * t**2 * p2[0] + t**3 * p3[0]
-    y = (1-t)**3 * p0[1] + 3*(1-t)**2 * t * p1[1] + 3*(1-t) * t**2 * p2[1] + t**3 * p3[1]
-    return (int(x), int(y))
+def bezier_points(p0: tuple, p1: tuple, p2: tuple, p3: tuple, t: np.ndarray) -> np.ndarray:
+    """Точки на кубической кривой Безье (все t за один проход)"""
+    u = 1 - t
+    basis = np.stack([u**3, 3 * u**2 * t, 3 * u * t**2, t**3], axis=1)
+    return basis @ np.array([p0, p1, p2, p3], dtype=float)
 
 
 def generate_human_path(start: tuple, end: tuple) -> list:
@@ -105,14 +141,59 @@ def generate_human_path(start: tuple, end: tuple) -> list:
     )
     
     num_points = random.randint(12, 25)
-    path = []
-    for i in range(num_points + 1):
-        t = i / num_points
-        point = bezier_point(start, ctrl1, ctrl2, end, t)
-        point = (point[0] + random.randint(-1, 1), point[1] + random.randint(-1, 1))
-        path.append(point)
+    t = np.linspace(0, 1, num_points + 1)
+    path = bezier_points(start, ctrl1, ctrl2, end, t).astype(int)
+    path += _rng.integers(-1, 2, path.shape)
+    
+    return [tuple(point) for point in path.tolist()]
+
+
+# Размер пула заготовленных путей
+PATH_POOL_SIZE = 32
+
+
+def generate_unit_path() -> np.ndarray:
+    """Канонический путь (0,0)→(1,0) — заготовка для пула"""
+    ctrl1 = (random.uniform(0.2, 0.4), random.uniform(-0.1, 0.1))
+    ctrl2 = (random.uniform(0.6, 0.8), random.uniform(-0.1, 0.1))
+    t = np.linspace(0, 1, random.randint(12, 25) + 1)
+    return bezier_points((0, 0), ctrl1, ctrl2, (1, 0), t)
+
+
+def fit_unit_path(unit_path: np.ndarray, start: tuple, end: tuple) -> list:
+    """Повернуть и растянуть заготовку так, чтобы она шла из start в end"""
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    # Поворот + масштаб одной матрицей: (x, y) -> (x*dx - y*dy, x*dy + y*dx)
+    transform = np.array([[dx, dy], [-dy, dx]], dtype=float)
+    path = (unit_path @ transform + start).astype(int)
+    path += _rng.integers(-1, 2, path.shape)
     
-    return path
+    return [tuple(point) for point in path.tolist()]
+
+
+def url_key(url: str) -> tuple:
+    """(тип, username) для URL Instagram; username неизвестен для /reel/ и /p/"""
+    parts = [part for part in urlparse(url).path.split('/') if part]
+    if not parts:
+        return ('home', None)
+    if parts[0] in ('reel', 'reels', 'p'):
+        return (parts[0], None)
+    if len(parts) > 1 and parts[1] in ('reel', 'p'):
+        return (parts[1], parts[0])
+    return ('profile', parts[0])
+
+
+def group_urls(urls: list) -> list:
+    """Убрать дубли и поставить URL одного аккаунта подряд (профиль — первым)"""
+    groups: dict = {}
+    for url in dict.fromkeys(u.strip() for u in urls):
+        username = url_key(url)[1]
+        groups.setdefault(username or url, []).append(url)
+    return [
+        url
+        for group in groups.values()
+        for url in sorted(group, key=lambda u: url_key(u)[0] != 'profile')
+    ]
 
 
 # =============================================================================
@@ -122,12 +203,55 @@ def generate_human_path(start: tuple, end: tuple) -> list:
 class InstagramHumanBot:
     """Бот для Instagram с человеческим поведением"""
     
-    def __init__(self, config: Optional[InstagramConfig] = None):
+    # Селекторы объединены в один CSS-запрос — один CDP round-trip вместо N
+    POPUP_SEL = ", ".join([
+        'button:has-text("Not Now")',
+        'button:has-text("Не сейчас")',
+        'button:has-text("Cancel")',
+        'button:has-text("Отмена")',
+        '[aria-label="Close"]',
+        '[aria-label="Закрыть"]',
+    ])
+    LIKE_SEL = ", ".join([
+        'svg[aria-label="Like"]',
+        'svg[aria-label="Нравится"]',
+        '[aria-label="Like"]',
+        '[aria-label="Нравится"]',
+        'span._aamw button',
+    ])
+    FOLLOW_SEL = ", ".join([
+        'button:has-text("Follow")',
+        'button:has-text("Подписаться")',
+        'div[role="button"]:has-text("Follow")',
+    ])
+    
+    # Один драйвер Playwright на все экземпляры бота
+    _shared_playwright = None
+    _playwright_users = 0
+    _playwright_lock = asyncio.Lock()
+    
+    def __init__(self, config: Optional[InstagramConfig] = None, context: Optional[BrowserContext] = None):
         self.config = config or InstagramConfig()
-        self.context: Optional[BrowserContext] = None
+        self.context: Optional[BrowserContext] = context
+        self._owns_context = context is None
         self.page: Optional[Page] = None
+        self.cdp: Optional[CDPSession] = None
         self.playwright = None
+        
+        # Фоновая страница для предзагрузки следующего URL
+        self.bg_page: Optional[Page] = None
+        self.bg_cdp: Optional[CDPSession] = None
+        self._next_url: Optional[str] = None
+        self._prefetch_url: Optional[str] = None
+        self._prefetch_task: Optional[asyncio.Task] = None
+        
+        # Лог пишется фоновой задачей из очереди
+        self._log_fh = None
+        self._log_q: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
+        
         self.mouse_pos = (215, 400)  # Примерный центр мобильного экрана
+        self._path_pool: list = []
         
         self.stats = {
             'total': 0,
@@ -137,25 +261,95 @@ class InstagramHumanBot:
             'start_time': None
         }
         
-        os.makedirs(self.config.screenshots_dir, exist_ok=True)
-        os.makedirs(self.config.user_data_dir, exist_ok=True)
+        ensure_dir(self.config.screenshots_dir)
+        ensure_dir(self.config.user_data_dir)
     
     def log(self, message: str):
         """Логирование"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_line = f"[{timestamp}] {message}"
         print(log_line)
-        with open(self.config.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_line + '\n')
+        if self._log_q is not None:
+            self._log_q.put_nowait(log_line)
+        else:
+            self._write_log_lines([log_line])
+    
+    def _write_log_lines(self, lines: list):
+        """Дописать строки в лог-файл"""
+        if self._log_fh is None:
+            self._log_fh = open(self.config.log_file, 'a', encoding='utf-8', buffering=8192)
+        self._log_fh.write('\n'.join(lines) + '\n')
+    
+    async def _log_consumer(self):
+        """Фоновая запись лога пачками (до 64 строк, не чаще раза в 0.5 с)"""
+        while True:
+            lines = [await self._log_q.get()]
+            while len(lines) < 64 and not self._log_q.empty():
+                lines.append(self._log_q.get_nowait())
+            
+            # None — сигнал остановки
+            done = None in lines
+            lines = [line for line in lines if line is not None]
+            if lines:
+                await asyncio.to_thread(self._write_log_lines, lines)
+                await asyncio.to_thread(self._log_fh.flush)
+            if done:
+                return
+            if self._log_q.empty():
+                await asyncio.sleep(0.5)
     
     async def start(self):
         """Запуск браузера"""
-        self.playwright = await async_playwright().start()
+        self._log_q = asyncio.Queue()
+        self._log_task = asyncio.create_task(self._log_consumer())
+        
+        self.playwright = await self._get_playwright()
+        
+        if self._owns_context:
+            self.context = await self._open_context()
+            self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        else:
+            # Чужой контекст: свои страницы, чужие не трогаем
+            self.page = await self.context.new_page()
+        
+        self.bg_page = await self.context.new_page()
+        
+        # Сырой CDP-канал для конвейерной отправки движений мыши
+        self.cdp = await self.context.new_cdp_session(self.page)
+        self.bg_cdp = await self.context.new_cdp_session(self.bg_page)
+        
+        # Anti-detection (на весь контекст — и для фоновой страницы)
+        await self.context.add_init_script(_INIT_JS)
         
+        self._path_pool = [generate_unit_path() for _ in range(PATH_POOL_SIZE)]
+        
+        self.stats['start_time'] = datetime.now()
+        self.log("✓ Браузер запущен (мобильный режим)")
+    
+    @classmethod
+    async def _get_playwright(cls):
+        """Общий драйвер Playwright (запускается при первом обращении)"""
+        async with cls._playwright_lock:
+            if cls._shared_playwright is None:
+                cls._shared_playwright = await async_playwright().start()
+            cls._playwright_users += 1
+            return cls._shared_playwright
+    
+    @classmethod
+    async def _release_playwright(cls):
+        """Остановить общий драйвер, когда он больше никому не нужен"""
+        async with cls._playwright_lock:
+            cls._playwright_users -= 1
+            if cls._playwright_users == 0 and cls._shared_playwright:
+                await cls._shared_playwright.stop()
+                cls._shared_playwright = None
+    
+    async def _open_context(self) -> BrowserContext:
+        """Запустить persistent-контекст для профиля из конфига"""
         # Мобильная эмуляция для Instagram
-        device = self.playwright.devices['iPhone 14 Pro Max']
+        device = self.playwright.devices[DEVICE_NAME]
         
-        self.context = await self.playwright.chromium.launch_persistent_context(
+        return await self.playwright.chromium.launch_persistent_context(
             user_data_dir=self.config.user_data_dir,
             headless=self.config.headless,
             **device,
@@ -165,34 +359,112 @@ class InstagramHumanBot:
             ],
             ignore_default_args=['--enable-automation'],
         )
-        
-        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
-        
-        # Anti-detection
-        await self.page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3]});
-        """)
-        
-        self.stats['start_time'] = datetime.now()
-        self.log("✓ Браузер запущен (мобильный режим)")
     
     async def stop(self):
         """Остановка"""
+        if self._prefetch_task:
+            self._prefetch_task.cancel()
         if self.context:
-            await self.context.close()
+            if self._owns_context:
+                await self.context.close()
+            else:
+                for page in (self.page, self.bg_page):
+                    if page:
+                        await page.close()
         if self.playwright:
-            await self.playwright.stop()
+            await self._release_playwright()
+            self.playwright = None
         self.log("✓ Браузер остановлен")
+        
+        if self._log_task:
+            self._log_q.put_nowait(None)
+            await self._log_task
+            self._log_q = None
+            self._log_task = None
+        
+        if self._log_fh:
+            self._log_fh.close()
+            self._log_fh = None
+    
+    async def open_url(self, url: str):
+        """Перейти на URL, используя предзагруженную фоновую страницу, если она есть"""
+        task, self._prefetch_task = self._prefetch_task, None
+        prefetched = False
+        
+        if task and self._prefetch_url == url:
+            try:
+                await task
+                prefetched = True
+            except PlaywrightError:
+                pass
+        elif task:
+            task.cancel()
+        
+        if prefetched:
+            self.page, self.bg_page = self.bg_page, self.page
+            self.cdp, self.bg_cdp = self.bg_cdp, self.cdp
+            await self.page.bring_to_front()
+        elif not await self._spa_navigate(url):
+            await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        
+        # Пока смотрим текущий URL — грузим следующий в фоне
+        # (URL того же аккаунта откроем кликом по ссылке, без предзагрузки)
+        if self._next_url and self.bg_page and not self._same_account(self._next_url):
+            self._prefetch_url = self._next_url
+            self._prefetch_task = asyncio.create_task(
+                self.bg_page.goto(self._next_url, wait_until='domcontentloaded', timeout=30000)
+            )
+    
+    def _same_account(self, url: str) -> bool:
+        """Открыт ли сейчас тот же аккаунт, что и в url"""
+        username = url_key(url)[1]
+        return username is not None and username == url_key(self.page.url)[1]
+    
+    async def _spa_navigate(self, url: str) -> bool:
+        """Перейти внутри SPA кликом по ссылке на странице того же аккаунта"""
+        if not self._same_account(url):
+            return False
+        
+        path = urlparse(url).path
+        link = f'a[href="{path}"]'
+        try:
+            if not await self.page.query_selector(link):
+                return False
+            if not await self.human_click(selector=link):
+                return False
+            await self.page.wait_for_url(f"**{path}", wait_until='domcontentloaded', timeout=10000)
+            return True
+        except PlaywrightError:
+            return False
     
     async def human_move(self, x: int, y: int):
         """Плавное движение мыши"""
-        path = generate_human_path(self.mouse_pos, (x, y))
+        if self._path_pool:
+            path = fit_unit_path(random.choice(self._path_pool), self.mouse_pos, (x, y))
+        else:
+            path = generate_human_path(self.mouse_pos, (x, y))
+        
+        # Все точки планируются сразу: события уходят в браузер по таймеру,
+        # не дожидаясь подтверждения предыдущего
+        moves = []
+        delay = 0.0
         for point in path:
-            await self.page.mouse.move(point[0], point[1])
-            await asyncio.sleep(random.uniform(0.003, 0.015))
+            delay += random.uniform(0.003, 0.015)
+            moves.append(self._dispatch_mouse_move(point[0], point[1], delay))
+        await asyncio.gather(*moves)
         self.mouse_pos = (x, y)
     
+    async def fast_human_move(self, x: int, y: int, steps: int = 20):
+        """Движение мыши одной командой (интерполяция на стороне драйвера)"""
+        await self.page.mouse.move(x, y, steps=steps)
+        self.mouse_pos = (x, y)
+        await asyncio.sleep(random_delay(0.1, 0.3))
+    
+    async def _dispatch_mouse_move(self, x: int, y: int, delay: float):
+        """Отправить mouseMoved через CDP с задержкой"""
+        await asyncio.sleep(delay)
+        await self.cdp.send("Input.dispatchMouseEvent", {"type": "mouseMoved", "x": x, "y": y})
+    
     async def human_click(self, selector: str = None, x: int = None, y: int = None):
         """Человеческий клик"""
         if selector:
@@ -228,12 +500,8 @@ class InstagramHumanBot:
         await self.page.mouse.move(start_x, start_y)
         await self.page.mouse.down()
         
-        steps = random.randint(5, 10)
-        for i in range(steps):
-            progress = (i + 1) / steps
-            current_y = start_y + (end_y - start_y) * progress
-            await self.page.mouse.move(start_x + random.randint(-5, 5), current_y)
-            await asyncio.sleep(random.uniform(0.02, 0.05))
+        # Драйвер сам интерполирует промежуточные точки — одна команда вместо N
+        await self.page.mouse.move(start_x + random.randint(-5, 5), end_y, steps=random.randint(5, 10))
         
         await self.page.mouse.up()
     
@@ -248,29 +516,20 @@ class InstagramHumanBot:
         await asyncio.sleep(random.uniform(0.05, 0.15))
         
         # Двойной тап
-        await self.page.mouse.click(x, y)
-        await asyncio.sleep(random.uniform(0.08, 0.15))
-        await self.page.mouse.click(x, y)
+        await self.page.mouse.click(x, y, click_count=2, delay=int(random.uniform(80, 150)))
     
-    async def dismiss_popups(self):
-        """Закрыть попапы"""
-        popup_selectors = [
-            'button:has-text("Not Now")',
-            'button:has-text("Не сейчас")',
-            'button:has-text("Cancel")',
-            'button:has-text("Отмена")',
-            '[aria-label="Close"]',
-            '[aria-label="Закрыть"]',
-        ]
-        
-        for selector in popup_selectors:
-            try:
-                btn = await self.page.query_selector(selector)
-                if btn and await btn.is_visible():
-                    await btn.click()
-                    await asyncio.sleep(0.5)
-            except:
-                pass
+    async def fast_click(self, selector: str, timeout: int = 500) -> bool:
+        """Быстрый клик через locator (без имитации — для служебных элементов)"""
+        try:
+            await self.page.locator(selector).first.click(timeout=timeout)
+            return True
+        except PlaywrightError:
+            return False
+    
+    async def dismiss_popups(self, timeout: int = 500):
+        """Закрыть попапы (timeout, мс — сколько ждать появления)"""
+        if await self.fast_click(f"{self.POPUP_SEL} >> visible=true", timeout=timeout):
+            await asyncio.sleep(0.5)
     
     async def random_actions(self):
         """Случайные человеческие действия"""
@@ -283,9 +542,23 @@ class InstagramHumanBot:
             # Случайное движение мыши
             x = random.randint(50, self.config.viewport_width - 50)
             y = random.randint(100, self.config.viewport_height - 100)
-            await self.human_move(x, y)
+            await self.fast_human_move(x, y)
             await asyncio.sleep(random_delay(0.2, 0.6))
     
+    async def _watch_with_actions(self, watch_time: float, busy: Optional[asyncio.Task] = None):
+        """Смотреть watch_time секунд, иногда делая случайные действия
+        (не раньше, чем завершится busy — чтобы ввод мыши не пересекался)"""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + watch_time
+        
+        while (remaining := end - loop.time()) > 0:
+            await asyncio.sleep(min(random_delay(3, 7), remaining))
+            
+            if busy is not None and not busy.done():
+                continue
+            if random.random() < 0.2 and loop.time() < end:
+                await self.random_actions()
+    
     async def like_content(self) -> bool:
         """Поставить лайк (двойной тап или кнопка)"""
         
@@ -297,52 +570,41 @@ class InstagramHumanBot:
             return True
         
         # Способ 2: Кнопка лайка
-        like_selectors = [
-            'svg[aria-label="Like"]',
-            'svg[aria-label="Нравится"]',
-            '[aria-label="Like"]',
-            '[aria-label="Нравится"]',
-            'span._aamw button',
-        ]
-        
-        for selector in like_selectors:
-            try:
-                like_btn = await self.page.query_selector(selector)
-                if like_btn:
-                    # Проверяем, не лайкнуто ли
-                    parent = await like_btn.evaluate_handle('el => el.closest("button") || el.parentElement')
-                    
-                    self.log("  ❤️ Кликаю кнопку лайка")
-                    await self.human_click(selector=selector)
-                    return True
-            except:
-                continue
+        try:
+            like_btn = await self.page.query_selector(self.LIKE_SEL)
+            if like_btn:
+                self.log("  ❤️ Кликаю кнопку лайка")
+                await self.human_click(selector=self.LIKE_SEL)
+                return True
+        except PlaywrightError as e:
+            self.log(f"  ⚠️ {e}")
         
         return False
     
+    async def like_with_timeout(self) -> bool:
+        """like_content с ограничением по времени"""
+        try:
+            return await asyncio.wait_for(self.like_content(), self.config.like_timeout)
+        except asyncio.TimeoutError:
+            self.log(f"  ⚠️ Лайк не удался за {self.config.like_timeout:.0f} сек")
+            return False
+    
     async def follow_account(self) -> bool:
         """Подписаться на аккаунт"""
-        follow_selectors = [
-            'button:has-text("Follow")',
-            'button:has-text("Подписаться")',
-            'div[role="button"]:has-text("Follow")',
-        ]
-        
-        for selector in follow_selectors:
-            try:
-                btn = await self.page.query_selector(selector)
-                if btn:
-                    text = await btn.inner_text()
-                    # Не кликаем если уже подписаны
-                    if 'Following' in text or 'Подписки' in text:
-                        self.log("  ✓ Уже подписан")
-                        return False
-                    
-                    self.log("  ➕ Подписываюсь")
-                    await self.human_click(selector=selector)
-                    return True
-            except:
-                continue
+        try:
+            btn = await self.page.query_selector(self.FOLLOW_SEL)
+            if btn:
+                text = await btn.inner_text()
+                # Не кликаем если уже подписаны
+                if 'Following' in text or 'Подписки' in text:
+                    self.log("  ✓ Уже подписан")
+                    return False
+                
+                self.log("  ➕ Подписываюсь")
+                await self.human_click(selector=self.FOLLOW_SEL)
+                return True
+        except PlaywrightError as e:
+            self.log(f"  ⚠️ {e}")
         
         return False
     
@@ -356,26 +618,27 @@ class InstagramHumanBot:
             self.log(f"   {url}")
             
             # Переход
-            await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            await asyncio.sleep(random_delay(2, 4))
-            await self.dismiss_popups()
+            await self.open_url(url)
+            await self.page.wait_for_load_state('domcontentloaded')
             
-            # Смотрим
             watch_time = random_delay(self.config.reel_watch_time_min, self.config.reel_watch_time_max)
+            
+            # Попапы закрываем параллельно с просмотром. Instagram рисует их
+            # после гидрации, поэтому ждём несколько секунд (не дольше просмотра)
+            popup_timeout = int(min(watch_time, 5.0) * 1000)
+            popup_task = asyncio.create_task(self.dismiss_popups(timeout=popup_timeout))
+            
+            # Смотрим
             self.log(f"  👀 Смотрю {watch_time:.1f} сек")
             
-            elapsed = 0
-            while elapsed < watch_time:
-                wait = min(random_delay(3, 7), watch_time - elapsed)
-                await asyncio.sleep(wait)
-                elapsed += wait
-                
-                if random.random() < 0.2:
-                    await self.random_actions()
+            try:
+                await self._watch_with_actions(watch_time, busy=popup_task)
+            finally:
+                await popup_task
             
             # Лайк
             if self.config.auto_like:
-                if await self.like_content():
+                if await self.like_with_timeout():
                     self.stats['likes'] += 1
             
             # Подписка (если включено)
@@ -401,7 +664,7 @@ class InstagramHumanBot:
             self.log(f"📷 Пост #{self.stats['total']}")
             self.log(f"   {url}")
             
-            await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            await self.open_url(url)
             await asyncio.sleep(random_delay(2, 3))
             await self.dismiss_popups()
             
@@ -417,7 +680,7 @@ class InstagramHumanBot:
             
             # Лайк
             if self.config.auto_like:
-                if await self.like_content():
+                if await self.like_with_timeout():
                     self.stats['likes'] += 1
             
             await asyncio.sleep(random_delay(0.5, 1.5))
@@ -438,7 +701,7 @@ class InstagramHumanBot:
             self.log(f"👤 Профиль #{self.stats['total']}")
             self.log(f"   {url}")
             
-            await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            await self.open_url(url)
             await asyncio.sleep(random_delay(2, 4))
             await self.dismiss_popups()
             
@@ -468,21 +731,25 @@ class InstagramHumanBot:
         """Определить тип URL и обработать"""
         url = url.strip()
         
-        if '/reel/' in url:
-            return await self.process_reel(url)
-        elif '/p/' in url:
-            return await self.process_post(url)
-        elif 'instagram.com/' in url:
-            return await self.process_profile(url)
-        else:
+        m = _URL_RE.search(url)
+        if not m:
             self.log(f"⚠️ Неизвестный тип URL: {url}")
             return False
+        
+        handler = {
+            'reel': self.process_reel,
+            'p': self.process_post,
+            None: self.process_profile,
+        }[m.group(1)]
+        return await handler(url)
     
     async def process_urls(self, urls: list[str], delay_between: tuple = (15, 45)):
         """Обработать список URL"""
+        urls = group_urls(urls)
         self.log(f"\n🚀 Начинаю обработку {len(urls)} URL")
         
         for i, url in enumerate(urls):
+            self._next_url = urls[i + 1] if i < len(urls) - 1 else None
             await self.process_url(url)
             
             if i < len(urls) - 1:
@@ -547,7 +814,7 @@ async def main():
                     break
                 if not url:
                     continue
-                if 'instagram.com' not in url:
+                if not _URL_RE.search(url):
                     print("⚠️ Это не Instagram URL")
                     continue
                 
@@ -561,7 +828,7 @@ async def main():
                 return
             
             with open(urls_file, 'r') as f:
-                urls = [line.strip() for line in f if line.strip() and 'instagram' in line.lower()]
+                urls = [line.strip() for line in f if _URL_RE.search(line)]
             
             if not urls:
                 print("❌ В файле нет Instagram URL")
@@ -582,4 +849,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(main())
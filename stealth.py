@@ -19,15 +19,19 @@ MAXIMUM STEALTH Bot + GoLogin
 """
 
 import asyncio
-import random
 import math
 import os
 import json
+import re
+import time
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass, field
+from functools import lru_cache
+from urllib.parse import urlparse
 import httpx
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+import numpy as np
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Error as PlaywrightError
 
 try:
     from gologin import GoLogin
@@ -35,6 +39,39 @@ try:
 except ImportError:
     GOLOGIN_SDK_AVAILABLE = False
 
+try:
+    import h2  # нужен httpx для HTTP/2
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+
+# JSON: orjson если установлен, иначе stdlib (оба работают с bytes)
+if ORJSON_AVAILABLE:
+    def _json_dumps(obj, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj, indent: bool = False) -> bytes:
+        # datetime — в ISO, как это делает orjson
+        return json.dumps(obj, indent=2 if indent else None, default=lambda o: o.isoformat()).encode()
+    _json_loads = json.loads
+
 
 # =============================================================================
 # ПРОДВИНУТАЯ ИМИТАЦИЯ ЧЕЛОВЕКА
@@ -43,28 +80,98 @@ except ImportError:
 class HumanBehavior:
     """Продвинутая имитация человеческого поведения"""
     
-    def __init__(self):
+    # Размер пачки случайных чисел
+    _RAND_BATCH = 4096
+    
+    # Размер кольцевого буфера истории мыши
+    HISTORY_SIZE = 1024
+    
+    # Черты личности — отдельные атрибуты, а не словарь
+    TRAITS = ('speed', 'accuracy', 'patience', 'curiosity', 'focus')
+    
+    __slots__ = (
+        'fatigue', 'session_start', 'actions_count',
+        *TRAITS,
+        '_hist', '_hist_i', 'last_action_time',
+        'rng', '_u_buf', '_u_idx', '_n_buf', '_n_idx',
+    )
+    
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        # Общий генератор случайных чисел (передаётся симуляторам)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        
         # Состояние "усталости" (0-1)
         self.fatigue = 0.0
-        self.session_start = datetime.now()
+        self.session_start = time.monotonic()
         self.actions_count = 0
         
         # Личность бота (генерируется случайно)
-        self.personality = {
-            'speed': random.uniform(0.7, 1.3),      # Скорость действий
-            'accuracy': random.uniform(0.85, 0.98), # Точность кликов
-            'patience': random.uniform(0.6, 1.4),   # Терпеливость (время просмотра)
-            'curiosity': random.uniform(0.3, 0.8),  # Любопытство (случайные действия)
-            'focus': random.uniform(0.7, 1.0),      # Концентрация
-        }
-        
-        # История позиций мыши для естественности
-        self.mouse_history: List[Tuple[int, int, float]] = []
-        self.last_action_time = datetime.now()
+        self.speed = float(self.rng.uniform(0.7, 1.3))      # Скорость действий
+        self.accuracy = float(self.rng.uniform(0.85, 0.98)) # Точность кликов
+        self.patience = float(self.rng.uniform(0.6, 1.4))   # Терпеливость (время просмотра)
+        self.curiosity = float(self.rng.uniform(0.3, 0.8))  # Любопытство (случайные действия)
+        self.focus = float(self.rng.uniform(0.7, 1.0))      # Концентрация
+        
+        # История позиций мыши: кольцевой буфер строк (x, y, t от начала сессии)
+        self._hist = np.zeros((self.HISTORY_SIZE, 3), dtype=np.float32)
+        self._hist_i = 0
+        self.last_action_time = time.monotonic()
+        
+        # Случайные числа берутся из буферов, пополняемых пачками
+        self._u_buf = None
+        self._u_idx = 0
+        self._n_buf = None
+        self._n_idx = 0
+    
+    def uniform(self, low: float = 0.0, high: float = 1.0) -> float:
+        """Равномерное число из буфера"""
+        if self._u_buf is None or self._u_idx >= len(self._u_buf):
+            self._u_buf = self.rng.random(self._RAND_BATCH).tolist()
+            self._u_idx = 0
+        u = self._u_buf[self._u_idx]
+        self._u_idx += 1
+        return low + (high - low) * u
+    
+    def gauss(self, mean: float, std: float) -> float:
+        """Нормальное число из буфера"""
+        if self._n_buf is None or self._n_idx >= len(self._n_buf):
+            self._n_buf = self.rng.standard_normal(self._RAND_BATCH).tolist()
+            self._n_idx = 0
+        z = self._n_buf[self._n_idx]
+        self._n_idx += 1
+        return mean + std * z
+    
+    def record_mouse(self, x: float, y: float):
+        """Записать позицию мыши в историю"""
+        self._hist[self._hist_i % self.HISTORY_SIZE] = (x, y, time.monotonic() - self.session_start)
+        self._hist_i += 1
+    
+    def recent(self, n: int) -> np.ndarray:
+        """Последние n записей истории (n, 3), от старых к новым"""
+        n = min(n, self._hist_i, self.HISTORY_SIZE)
+        idx = np.arange(self._hist_i - n, self._hist_i) % self.HISTORY_SIZE
+        return self._hist[idx]
+    
+    def randint(self, low: int, high: int) -> int:
+        """Целое из [low, high] включительно (как random.randint)"""
+        return low + int(self.uniform() * (high - low + 1))
     
-    def update_fatigue(self):
-        """Обновить уровень усталости"""
-        session_duration = (datetime.now() - self.session_start).total_seconds() / 60
+    @property
+    def personality(self) -> Dict[str, float]:
+        """Черты личности словарём (для сохранения состояния)"""
+        return {trait: getattr(self, trait) for trait in self.TRAITS}
+    
+    @personality.setter
+    def personality(self, values: Dict[str, float]):
+        for trait in self.TRAITS:
+            if trait in values:
+                setattr(self, trait, values[trait])
+    
+    def update_fatigue(self, steps: int = 1):
+        """Обновить уровень усталости (steps — сколько действий засчитать разом)"""
+        # Результат тот же, что у steps вызовов подряд
+        self.actions_count += steps - 1
+        session_duration = (time.monotonic() - self.session_start) / 60.0
         
         # Усталость растёт со временем и количеством действий
         time_fatigue = min(session_duration / 60, 0.5)  # Max 0.5 за час
@@ -78,145 +185,205 @@ class HumanBehavior:
         # Базовая задержка
         mean = (base_min + base_max) / 2
         std = (base_max - base_min) / 4
-        delay = random.gauss(mean, std)
+        delay = self.gauss(mean, std)
         
         # Корректировка на личность
-        delay *= self.personality['speed']
+        delay *= self.speed
         
         # Усталость замедляет
         delay *= (1 + self.fatigue * 0.5)
         
         # Иногда очень длинные паузы (задумался)
-        if random.random() < 0.05:
-            delay *= random.uniform(2, 4)
+        if self.uniform() < 0.05:
+            delay *= self.uniform(2, 4)
         
         return max(base_min * 0.5, min(base_max * 2, delay))
     
     def should_make_mistake(self) -> bool:
         """Должен ли сделать ошибку?"""
-        base_prob = 1 - self.personality['accuracy']
+        base_prob = 1 - self.accuracy
         fatigue_bonus = self.fatigue * 0.1
-        return random.random() < (base_prob + fatigue_bonus)
+        return self.uniform() < (base_prob + fatigue_bonus)
     
     def should_get_distracted(self) -> bool:
         """Должен ли отвлечься?"""
-        base_prob = self.personality['curiosity'] * 0.1
+        base_prob = self.curiosity * 0.1
         fatigue_bonus = self.fatigue * 0.05
-        return random.random() < (base_prob + fatigue_bonus)
+        return self.uniform() < (base_prob + fatigue_bonus)
     
     def get_watch_time_multiplier(self) -> float:
         """Множитель времени просмотра"""
-        base = self.personality['patience']
+        base = self.patience
         # Уставший смотрит меньше
         fatigue_penalty = self.fatigue * 0.3
         # Случайная вариация
-        random_factor = random.uniform(0.8, 1.2)
+        random_factor = self.uniform(0.8, 1.2)
         return max(0.5, base - fatigue_penalty) * random_factor
 
 
+def _make_tremor_lut(size: int = 4096) -> np.ndarray:
+    """Таблица тремора: плавное блуждание с возвратом к нулю, ±3px"""
+    noise = np.random.default_rng(0).standard_normal(size)
+    lut = np.empty(size)
+    x = 0.0
+    for i in range(size):
+        x = 0.9 * x + 0.5 * noise[i]
+        lut[i] = x
+    return np.clip(lut, -3, 3).astype(np.float32)
+
+
+# Тремор руки читается из таблицы по индексу (размер — степень двойки)
+_TREMOR_LUT = _make_tremor_lut()
+_TREMOR_MASK = len(_TREMOR_LUT) - 1
+
+# Матрица Катмулла-Рома для базиса [t³, t², t, 1]
+CATMULL_ROM = 0.5 * np.array([
+    [-1,  3, -3,  1],
+    [ 2, -5,  4, -1],
+    [-1,  0,  1,  0],
+    [ 0,  2,  0,  0],
+], dtype=float)
+
+
+@lru_cache(maxsize=64)
+def _cr_basis(samples_per_segment: int) -> np.ndarray:
+    """Базис сплайна (samples_per_segment, 4) — кэшируется по числу сэмплов"""
+    t = np.linspace(0, 1, samples_per_segment, endpoint=False)
+    basis = np.stack([t**3, t**2, t, np.ones_like(t)], axis=1) @ CATMULL_ROM
+    basis.flags.writeable = False
+    return basis
+
+
+@njit(cache=True, fastmath=True)
+def _gen_controls_njit(start_x, start_y, end_x, end_y, angles, overshoot_dist):
+    """Контрольные точки пути (N, 2); overshoot_dist > 0 — точка за целью"""
+    dx, dy = end_x - start_x, end_y - start_y
+    distance = math.sqrt(dx*dx + dy*dy)
+    
+    num_controls = angles.shape[0]
+    extra = 1 if overshoot_dist > 0 else 0
+    points = np.empty((num_controls + 2 + extra, 2))
+    points[0, 0], points[0, 1] = start_x, start_y
+    
+    for i in range(num_controls):
+        progress = (i + 1) / (num_controls + 1)
+        # Отклонение (больше в середине пути)
+        deviation = math.sin(progress * math.pi) * distance * 0.15
+        points[i + 1, 0] = start_x + dx * progress + math.cos(angles[i]) * deviation
+        points[i + 1, 1] = start_y + dy * progress + math.sin(angles[i]) * deviation
+    
+    if extra:
+        angle = math.atan2(dy, dx)
+        points[num_controls + 1, 0] = end_x + math.cos(angle) * overshoot_dist
+        points[num_controls + 1, 1] = end_y + math.sin(angle) * overshoot_dist
+    
+    points[-1, 0], points[-1, 1] = end_x, end_y
+    return points
+
+
+@njit(cache=True, fastmath=True)
+def _catmull_rom_njit(points, num_samples):
+    """Сплайн Катмулла-Рома по точкам (N, 2); концы продлеваются повтором"""
+    n = points.shape[0]
+    segments = n - 1
+    samples_per_segment = num_samples // segments
+    
+    result = np.empty((segments * samples_per_segment + 1, 2))
+    k = 0
+    for seg in range(segments):
+        p0 = points[max(seg - 1, 0)]
+        p1 = points[seg]
+        p2 = points[seg + 1]
+        p3 = points[min(seg + 2, n - 1)]
+        
+        for i in range(samples_per_segment):
+            t = i / samples_per_segment
+            t2, t3 = t*t, t*t*t
+            for d in range(2):
+                result[k, d] = 0.5 * (
+                    2*p1[d] + (-p0[d]+p2[d])*t +
+                    (2*p0[d]-5*p1[d]+4*p2[d]-p3[d])*t2 +
+                    (-p0[d]+3*p1[d]-3*p2[d]+p3[d])*t3
+                )
+            k += 1
+    
+    result[k] = points[n - 1]
+    return result
+
+
+def _warmup_numba():
+    """Скомпилировать njit-функции заранее (типы аргументов — как в move_to)"""
+    _gen_controls_njit(0.0, 0.0, 100.0, 100.0, np.zeros(2), 0.0)
+    _catmull_rom_njit(np.zeros((4, 2)), 8)
+
+
 class AdvancedMouseSimulator:
     """Продвинутый симулятор движения мыши"""
     
-    def __init__(self, page: Page, behavior: HumanBehavior):
+    # Промежуточных шагов, которые драйвер интерполирует между опорными точками
+    MOVE_STEPS = 3
+    
+    def __init__(self, page: Page, behavior: HumanBehavior, rng: Optional[np.random.Generator] = None):
         self.page = page
         self.behavior = behavior
+        self.rng = rng if rng is not None else behavior.rng
         self.current_pos = (0, 0)
         self.velocity = (0, 0)
     
-    def _perlin_noise(self, t: float, octaves: int = 3) -> float:
-        """Шум Перлина для естественного тремора"""
-        result = 0
-        for i in range(octaves):
-            freq = 2 ** i
-            amp = 0.5 ** i
-            result += math.sin(t * freq * 2 * math.pi) * amp
-        return result
-    
     def _generate_control_points(
         self, 
         start: Tuple[int, int], 
         end: Tuple[int, int],
         overshoot: bool = False
-    ) -> List[Tuple[float, float]]:
+    ) -> np.ndarray:
         """Генерация контрольных точек с возможным промахом"""
         
         dx, dy = end[0] - start[0], end[1] - start[1]
-        distance = math.sqrt(dx*dx + dy*dy)
-        
-        # Количество контрольных точек зависит от расстояния
-        num_controls = max(2, int(distance / 100))
-        
-        points = [start]
+        d2 = dx*dx + dy*dy
         
-        for i in range(num_controls):
-            progress = (i + 1) / (num_controls + 1)
-            
-            # Базовая позиция
-            base_x = start[0] + dx * progress
-            base_y = start[1] + dy * progress
-            
-            # Отклонение (больше в середине пути)
-            deviation = math.sin(progress * math.pi) * distance * 0.15
-            angle = random.uniform(-math.pi/3, math.pi/3)
-            
-            ctrl_x = base_x + math.cos(angle) * deviation
-            ctrl_y = base_y + math.sin(angle) * deviation
-            
-            points.append((ctrl_x, ctrl_y))
+        # Количество контрольных точек зависит от расстояния (до 200px — всегда 2)
+        num_controls = 2 if d2 < 40000 else int(math.sqrt(d2) / 100)
+        angles = self.rng.uniform(-math.pi/3, math.pi/3, num_controls)
         
         # Если промах — добавляем точку за целью
-        if overshoot:
-            overshoot_dist = random.uniform(5, 25)
-            angle = math.atan2(dy, dx)
-            overshoot_point = (
-                end[0] + math.cos(angle) * overshoot_dist,
-                end[1] + math.sin(angle) * overshoot_dist
-            )
-            points.append(overshoot_point)
+        overshoot_dist = self.behavior.uniform(5, 25) if overshoot else 0.0
         
-        points.append(end)
-        return points
+        return _gen_controls_njit(
+            float(start[0]), float(start[1]), float(end[0]), float(end[1]),
+            angles, overshoot_dist
+        )
     
     def _catmull_rom_spline(
         self, 
-        points: List[Tuple[float, float]], 
+        points: np.ndarray, 
         num_samples: int
     ) -> List[Tuple[int, int]]:
         """Сплайн Катмулла-Рома для плавной кривой"""
         
+        points = np.asarray(points, dtype=float)
+        
         if len(points) < 2:
             return [(int(points[0][0]), int(points[0][1]))]
         
-        # Добавляем граничные точки
-        extended = [points[0]] + points + [points[-1]]
-        
-        result = []
-        segments = len(extended) - 3
-        
-        for seg in range(segments):
-            p0, p1, p2, p3 = extended[seg:seg+4]
+        if NUMBA_AVAILABLE:
+            coords = _catmull_rom_njit(points, num_samples)
+        else:
+            # Добавляем граничные точки
+            extended = np.vstack([points[:1], points, points[-1:]])
             
+            segments = len(extended) - 3
             samples_per_segment = num_samples // segments
             
-            for i in range(samples_per_segment):
-                t = i / samples_per_segment
-                t2, t3 = t*t, t*t*t
-                
-                x = 0.5 * (
-                    2*p1[0] + (-p0[0]+p2[0])*t +
-                    (2*p0[0]-5*p1[0]+4*p2[0]-p3[0])*t2 +
-                    (-p0[0]+3*p1[0]-3*p2[0]+p3[0])*t3
-                )
-                y = 0.5 * (
-                    2*p1[1] + (-p0[1]+p2[1])*t +
-                    (2*p0[1]-5*p1[1]+4*p2[1]-p3[1])*t2 +
-                    (-p0[1]+3*p1[1]-3*p2[1]+p3[1])*t3
-                )
-                
-                result.append((int(x), int(y)))
+            # Окна по 4 точки на каждый сегмент: (segments, 4, 2)
+            windows = np.stack([extended[seg:seg+4] for seg in range(segments)])
+            
+            # Базис один на все сегменты: (samples_per_segment, 4)
+            basis = _cr_basis(samples_per_segment)
+            
+            coords = np.einsum('nk,skd->snd', basis, windows).reshape(-1, 2)
+            coords = np.vstack([coords, extended[-1]])
         
-        result.append((int(points[-1][0]), int(points[-1][1])))
-        return result
+        return [tuple(point) for point in np.rint(coords).astype(np.int32).tolist()]
     
     async def move_to(
         self, 
@@ -226,50 +393,69 @@ class AdvancedMouseSimulator:
         """Переместить мышь к цели с человеческим поведением"""
         
         start = self.current_pos
-        distance = math.sqrt((target[0]-start[0])**2 + (target[1]-start[1])**2)
+        dx, dy = target[0] - start[0], target[1] - start[1]
+        d2 = dx*dx + dy*dy
         
-        if distance < 5:
+        # Пороги сравниваем с квадратом расстояния: 5px, 30px, 50px
+        if d2 < 25:
             return
         
+        # На коротких дистанциях сплайн и тремор не нужны
+        if d2 < 900:
+            return await self._short_move(start, target)
+        
+        distance = math.sqrt(d2)
+        
         # Решаем, будет ли промах
-        overshoot = allow_overshoot and self.behavior.should_make_mistake() and distance > 50
+        overshoot = allow_overshoot and d2 > 2500 and self.behavior.should_make_mistake()
         
         # Генерируем путь
         controls = self._generate_control_points(start, target, overshoot)
-        num_points = max(15, int(distance / 5))
+        # Опорная точка на ~15px; между ними драйвер добавит MOVE_STEPS шагов
+        num_points = max(6, int(distance / 15))
         path = self._catmull_rom_spline(controls, num_points)
         
-        # Добавляем тремор и движемся
-        time_offset = random.random() * 1000
+        # Тремор руки (микро-движения) — для всего пути разом, из таблицы
+        idx = (int(self.rng.integers(len(_TREMOR_LUT))) + np.arange(len(path))) & _TREMOR_MASK
+        tremor = np.stack([_TREMOR_LUT[idx], _TREMOR_LUT[(idx + len(_TREMOR_LUT) // 2) & _TREMOR_MASK]], axis=1)
+        final_path = np.rint(np.asarray(path) + tremor).astype(np.int32).tolist()
         
-        for i, (x, y) in enumerate(path):
-            # Тремор руки (микро-движения)
-            tremor_x = self._perlin_noise(time_offset + i * 0.1) * 2
-            tremor_y = self._perlin_noise(time_offset + i * 0.1 + 100) * 2
-            
-            final_x = int(x + tremor_x)
-            final_y = int(y + tremor_y)
-            
-            await self.page.mouse.move(final_x, final_y)
-            
-            # Переменная скорость (быстрее в середине, медленнее к концу)
-            progress = i / len(path)
-            speed_curve = math.sin(progress * math.pi)  # 0 -> 1 -> 0
-            base_delay = 0.008
-            delay = base_delay * (1 + (1 - speed_curve) * 0.5)
-            
-            # Иногда микро-паузы
-            if random.random() < 0.02:
-                delay += random.uniform(0.05, 0.15)
-            
-            await asyncio.sleep(delay)
+        # Переменная скорость (быстрее в середине, медленнее к концу)
+        n = len(final_path)
+        speed_curve = np.sin(np.arange(n) / n * np.pi)  # 0 -> 1 -> 0
+        base_delay = 0.008 * self.MOVE_STEPS
+        delays = base_delay * (1 + (1 - speed_curve) * 0.5)
+        
+        # Иногда микро-паузы
+        pauses = self.rng.random(n) < 0.02 * self.MOVE_STEPS
+        delays[pauses] += self.rng.uniform(0.05, 0.15, pauses.sum())
+        
+        for (final_x, final_y), delay in zip(final_path, delays.tolist()):
+            await self.page.mouse.move(final_x, final_y, steps=self.MOVE_STEPS)
             self.current_pos = (final_x, final_y)
+            await asyncio.sleep(delay)
+        
+        self.behavior.record_mouse(*self.current_pos)
         
         # Если был промах — корректируем
         if overshoot:
-            await asyncio.sleep(random.uniform(0.1, 0.3))
+            await asyncio.sleep(self.behavior.uniform(0.1, 0.3))
             await self.move_to(target, allow_overshoot=False)
     
+    async def _short_move(self, start: Tuple[int, int], target: Tuple[int, int], steps: int = 3):
+        """Короткое движение: линейно, с дрожанием ±1px"""
+        for i in range(1, steps + 1):
+            k = i / steps
+            x = round(start[0] + (target[0] - start[0]) * k)
+            y = round(start[1] + (target[1] - start[1]) * k)
+            if i < steps:
+                x += self.behavior.randint(-1, 1)
+                y += self.behavior.randint(-1, 1)
+            await self.page.mouse.move(x, y)
+            await asyncio.sleep(0.01)
+            self.current_pos = (x, y)
+        self.behavior.record_mouse(x, y)
+    
     async def click_at(
         self, 
         target: Tuple[int, int],
@@ -279,8 +465,8 @@ class AdvancedMouseSimulator:
         
         # Не кликаем точно в центр
         actual_target = (
-            target[0] + random.randint(-click_variation, click_variation),
-            target[1] + random.randint(-click_variation, click_variation)
+            target[0] + self.behavior.randint(-click_variation, click_variation),
+            target[1] + self.behavior.randint(-click_variation, click_variation)
         )
         
         await self.move_to(actual_target)
@@ -289,33 +475,63 @@ class AdvancedMouseSimulator:
         await asyncio.sleep(self.behavior.get_adjusted_delay(0.1, 0.4))
         
         # Иногда двигаем мышь во время клика (дрожание)
-        if random.random() < 0.1:
+        if self.behavior.uniform() < 0.1:
             asyncio.create_task(self._micro_movement())
         
         await self.page.mouse.down()
         
         # Время удержания кнопки
-        hold_time = random.uniform(0.05, 0.15)
+        hold_time = self.behavior.uniform(0.05, 0.15)
         await asyncio.sleep(hold_time)
         
         await self.page.mouse.up()
     
+    async def double_click_at(
+        self,
+        target: Tuple[int, int],
+        click_variation: int = 5
+    ):
+        """Двойной клик: одно движение и прицеливание, затем два клика подряд"""
+        
+        actual_target = (
+            target[0] + self.behavior.randint(-click_variation, click_variation),
+            target[1] + self.behavior.randint(-click_variation, click_variation)
+        )
+        
+        await self.move_to(actual_target)
+        await asyncio.sleep(self.behavior.get_adjusted_delay(0.1, 0.4))
+        
+        await self.page.mouse.down()
+        await asyncio.sleep(self.behavior.uniform(0.03, 0.08))
+        await self.page.mouse.up()
+        await asyncio.sleep(self.behavior.uniform(0.08, 0.15))
+        
+        # Второй клик почти в ту же точку — браузер засчитает его как dblclick
+        x = self.current_pos[0] + self.behavior.randint(-2, 2)
+        y = self.current_pos[1] + self.behavior.randint(-2, 2)
+        await self.page.mouse.move(x, y)
+        self.current_pos = (x, y)
+        await self.page.mouse.down(click_count=2)
+        await asyncio.sleep(self.behavior.uniform(0.03, 0.08))
+        await self.page.mouse.up(click_count=2)
+    
     async def _micro_movement(self):
         """Микро-движение во время клика"""
         await asyncio.sleep(0.02)
         x, y = self.current_pos
         await self.page.mouse.move(
-            x + random.randint(-2, 2),
-            y + random.randint(-2, 2)
+            x + self.behavior.randint(-2, 2),
+            y + self.behavior.randint(-2, 2)
         )
 
 
 class AdvancedScrollSimulator:
     """Продвинутый симулятор скролла"""
     
-    def __init__(self, page: Page, behavior: HumanBehavior):
+    def __init__(self, page: Page, behavior: HumanBehavior, rng: Optional[np.random.Generator] = None):
         self.page = page
         self.behavior = behavior
+        self.rng = rng if rng is not None else behavior.rng
     
     async def scroll(
         self, 
@@ -326,7 +542,7 @@ class AdvancedScrollSimulator:
         """Человеческий скролл"""
         
         if amount is None:
-            amount = random.randint(150, 400)
+            amount = self.behavior.randint(150, 400)
         
         if direction == 'up':
             amount = -amount
@@ -336,41 +552,32 @@ class AdvancedScrollSimulator:
             return
         
         # Разбиваем на шаги с ускорением/замедлением
-        steps = random.randint(8, 15)
+        steps = self.behavior.randint(8, 15)
         
-        # Генерируем профиль скорости (ease-in-out)
-        velocities = []
-        for i in range(steps):
-            t = i / (steps - 1)
-            # Синусоидальный ease-in-out
-            velocity = math.sin(t * math.pi)
-            velocities.append(velocity)
-        
-        # Нормализуем
-        total = sum(velocities)
-        step_amounts = [int(amount * v / total) for v in velocities]
+        # Профиль скорости (синусоидальный ease-in-out), нормированный на amount
+        velocities = np.sin(np.linspace(0, 1, steps) * np.pi)
+        step_amounts = np.rint(amount * velocities / velocities.sum()).astype(int)
         
         # Корректируем остаток
-        diff = amount - sum(step_amounts)
-        step_amounts[len(step_amounts)//2] += diff
+        step_amounts[steps // 2] += amount - step_amounts.sum()
         
-        for step_amount in step_amounts:
+        for step_amount in step_amounts.tolist():
             # Добавляем случайность
-            actual = step_amount + random.randint(-3, 3)
+            actual = step_amount + self.behavior.randint(-3, 3)
             
             await self.page.mouse.wheel(0, actual)
             
             # Переменная задержка
-            delay = random.uniform(0.02, 0.06)
-            if random.random() < 0.1:
-                delay += random.uniform(0.1, 0.3)  # Иногда пауза
+            delay = self.behavior.uniform(0.02, 0.06)
+            if self.behavior.uniform() < 0.1:
+                delay += self.behavior.uniform(0.1, 0.3)  # Иногда пауза
             
             await asyncio.sleep(delay)
         
         # Инерция (небольшой дополнительный скролл)
-        if random.random() < 0.3:
-            await asyncio.sleep(random.uniform(0.1, 0.2))
-            inertia = random.randint(10, 30) * (1 if amount > 0 else -1)
+        if self.behavior.uniform() < 0.3:
+            await asyncio.sleep(self.behavior.uniform(0.1, 0.2))
+            inertia = self.behavior.randint(10, 30) * (1 if amount > 0 else -1)
             await self.page.mouse.wheel(0, inertia)
 
 
@@ -381,20 +588,41 @@ class AdvancedScrollSimulator:
 class HumanActions:
     """Случайные человеческие действия для маскировки"""
     
-    def __init__(self, page: Page, mouse: AdvancedMouseSimulator, behavior: HumanBehavior):
+    # Как долго доверять закэшированному размеру viewport (сек)
+    VIEWPORT_TTL = 30.0
+    
+    def __init__(self, page: Page, mouse: AdvancedMouseSimulator, behavior: HumanBehavior,
+                 scroller: Optional[AdvancedScrollSimulator] = None,
+                 rng: Optional[np.random.Generator] = None):
         self.page = page
         self.mouse = mouse
         self.behavior = behavior
+        self.rng = rng if rng is not None else behavior.rng
+        self._scroller = scroller or AdvancedScrollSimulator(page, behavior, self.rng)
+        
+        self._viewport: Optional[Dict[str, int]] = None
+        self._viewport_ts = 0.0
+        # После навигации размер мог поменяться — перечитаем
+        self.page.on("framenavigated", lambda _: setattr(self, "_viewport", None))
+        
+        self._distraction_actions = (self.idle_movement, self.look_around, self.check_something_else)
+    
+    async def _get_viewport(self) -> Dict[str, int]:
+        """Размер viewport с кэшем"""
+        if self._viewport is None or time.monotonic() - self._viewport_ts > self.VIEWPORT_TTL:
+            self._viewport = await self.page.evaluate('() => ({w: window.innerWidth, h: window.innerHeight})')
+            self._viewport_ts = time.monotonic()
+        return self._viewport
     
     async def idle_movement(self):
         """Случайное движение мыши когда 'думаем'"""
-        viewport = await self.page.evaluate('() => ({w: window.innerWidth, h: window.innerHeight})')
+        viewport = await self._get_viewport()
         
         # Небольшое случайное движение
         current = self.mouse.current_pos
         target = (
-            current[0] + random.randint(-100, 100),
-            current[1] + random.randint(-50, 50)
+            current[0] + self.behavior.randint(-100, 100),
+            current[1] + self.behavior.randint(-50, 50)
         )
         
         # Ограничиваем viewport
@@ -413,25 +641,25 @@ class HumanActions:
         elapsed = 0
         while elapsed < duration:
             # Иногда двигаем мышь как будто следим за текстом
-            if random.random() < 0.3:
+            if self.behavior.uniform() < 0.3:
                 await self.idle_movement()
             
-            wait = random.uniform(0.5, 1.5)
+            wait = self.behavior.uniform(0.5, 1.5)
             await asyncio.sleep(wait)
             elapsed += wait
     
     async def look_around(self):
         """Осмотреться на странице"""
-        viewport = await self.page.evaluate('() => ({w: window.innerWidth, h: window.innerHeight})')
+        viewport = await self._get_viewport()
         
         # 2-4 случайных взгляда
-        for _ in range(random.randint(2, 4)):
+        for _ in range(self.behavior.randint(2, 4)):
             target = (
-                random.randint(100, viewport['w'] - 100),
-                random.randint(100, viewport['h'] - 100)
+                self.behavior.randint(100, viewport['w'] - 100),
+                self.behavior.randint(100, viewport['h'] - 100)
             )
             await self.mouse.move_to(target)
-            await asyncio.sleep(random.uniform(0.3, 0.8))
+            await asyncio.sleep(self.behavior.uniform(0.3, 0.8))
     
     async def hesitate(self):
         """Заколебаться перед действием"""
@@ -440,21 +668,19 @@ class HumanActions:
         
         # Немного подвинуться
         offset = (
-            current[0] + random.randint(-30, 30),
-            current[1] + random.randint(-20, 20)
+            current[0] + self.behavior.randint(-30, 30),
+            current[1] + self.behavior.randint(-20, 20)
         )
         await self.mouse.move_to(offset)
-        await asyncio.sleep(random.uniform(0.2, 0.5))
+        await asyncio.sleep(self.behavior.uniform(0.2, 0.5))
     
     async def check_something_else(self):
         """Проверить что-то другое (отвлечься)"""
         # Скролл вверх чтобы посмотреть что-то
-        scroller = AdvancedScrollSimulator(self.page, self.behavior)
-        
-        if random.random() < 0.5:
-            await scroller.scroll('up', random.randint(100, 300))
-            await asyncio.sleep(random.uniform(1, 3))
-            await scroller.scroll('down', random.randint(100, 300))
+        if self.behavior.uniform() < 0.5:
+            await self._scroller.scroll('up', self.behavior.randint(100, 300))
+            await asyncio.sleep(self.behavior.uniform(1, 3))
+            await self._scroller.scroll('down', self.behavior.randint(100, 300))
         else:
             # Или просто посмотреть в сторону
             await self.look_around()
@@ -462,11 +688,7 @@ class HumanActions:
     async def maybe_distraction(self):
         """Может отвлечься на что-то"""
         if self.behavior.should_get_distracted():
-            action = random.choice([
-                self.idle_movement,
-                self.look_around,
-                self.check_something_else,
-            ])
+            action = self._distraction_actions[self.rng.integers(len(self._distraction_actions))]
             await action()
             return True
         return False
@@ -476,38 +698,79 @@ class HumanActions:
 # GoLogin API Client
 # =============================================================================
 
+# Один HTTP-клиент на процесс: общий пул соединений для всех GoLoginAPI
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+_HTTP_CLIENT_USERS = 0
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Взять общий клиент (создаётся при первом обращении)"""
+    global _HTTP_CLIENT, _HTTP_CLIENT_USERS
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=H2_AVAILABLE,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    _HTTP_CLIENT_USERS += 1
+    return _HTTP_CLIENT
+
+
+async def _release_http_client():
+    """Отпустить общий клиент; последний пользователь его закрывает"""
+    global _HTTP_CLIENT, _HTTP_CLIENT_USERS
+    _HTTP_CLIENT_USERS -= 1
+    if _HTTP_CLIENT_USERS <= 0 and _HTTP_CLIENT is not None:
+        client, _HTTP_CLIENT = _HTTP_CLIENT, None
+        _HTTP_CLIENT_USERS = 0
+        await client.aclose()
+
+
 class GoLoginAPI:
     """GoLogin REST API клиент"""
     
     BASE_URL = "https://api.gologin.com"
     CLOUD_BROWSER_URL = "wss://cloudbrowser.gologin.com/connect"
     
+    # Куда передавать data для каждого метода (DELETE — без тела)
+    _DATA_ARG = {"GET": "params", "POST": "content", "PATCH": "content", "DELETE": None}
+    
     def __init__(self, token: str):
         self.token = token
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
+        # Общий клиент процесса — keep-alive, TLS и HTTP/2 на все профили
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def aclose(self):
+        if self._client is not None:
+            self._client = None
+            await _release_http_client()
     
     async def _request(self, method: str, endpoint: str, data: dict = None) -> dict:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{self.BASE_URL}{endpoint}"
-            
-            if method == "GET":
-                response = await client.get(url, headers=self.headers, params=data)
-            elif method == "POST":
-                response = await client.post(url, headers=self.headers, json=data)
-            elif method == "PATCH":
-                response = await client.patch(url, headers=self.headers, json=data)
-            elif method == "DELETE":
-                response = await client.delete(url, headers=self.headers)
-            else:
-                raise ValueError(f"Unknown method: {method}")
-            
-            if response.status_code >= 400:
-                raise Exception(f"GoLogin API error {response.status_code}: {response.text}")
-            
-            return response.json() if response.text else {}
+        if self._client is None:
+            self._client = _get_http_client()
+        url = f"{self.BASE_URL}{endpoint}"
+        
+        if method not in self._DATA_ARG:
+            raise ValueError(f"Unknown method: {method}")
+        
+        data_arg = self._DATA_ARG[method]
+        kwargs = {}
+        if data_arg == "params":
+            kwargs["params"] = data
+        elif data_arg == "content" and data is not None:
+            # Тело кодируем сами; Content-Type приходит из self.headers на каждом запросе
+            kwargs["content"] = _json_dumps(data)
+        # Токен у каждого экземпляра свой — заголовки передаём на запрос
+        response = await self._client.request(method, url, headers=self.headers, **kwargs)
+        
+        if response.status_code >= 400:
+            raise Exception(f"GoLogin API error {response.status_code}: {response.text}")
+        
+        return _json_loads(response.content) if response.content else {}
     
     async def get_profiles(self, limit: int = 100) -> List[Dict]:
         result = await self._request("GET", "/browser/v2", {"limit": limit})
@@ -573,20 +836,148 @@ class StealthConfig:
     auto_follow: bool = False
     follow_probability: float = 0.1
     
+    # Переходы внутри Instagram через History API, без перезагрузки страницы.
+    # Быстрее, но со стороны выглядит иначе, чем обычная навигация
+    spa_navigation: bool = False
+    
     # Файлы
     log_file: str = "./stealth.log"
     screenshots_dir: str = "./screenshots"
     state_file: str = "./bot_state.json"  # Сохранение состояния
+    state_checkpoint_every: int = 5       # Сохранять состояние каждые N URL
+    
+    # Seed генератора случайных чисел (None — случайный; задать для отладки)
+    rng_seed: Optional[int] = None
 
 
 # =============================================================================
 # Основной Stealth Bot
 # =============================================================================
 
+# Один драйвер Playwright на процесс: сессии бота подключаются к нему по очереди
+_PW = None
+_PW_USERS = 0
+_PW_LOCK = asyncio.Lock()
+
+
+async def get_playwright():
+    """Общий драйвер Playwright (запускается при первом обращении)"""
+    global _PW, _PW_USERS
+    async with _PW_LOCK:
+        if _PW is None:
+            _PW = await async_playwright().start()
+        _PW_USERS += 1
+        return _PW
+
+
+async def release_playwright():
+    """Отпустить драйвер; последний пользователь его останавливает"""
+    global _PW, _PW_USERS
+    async with _PW_LOCK:
+        _PW_USERS -= 1
+        if _PW_USERS <= 0 and _PW is not None:
+            pw, _PW = _PW, None
+            _PW_USERS = 0
+            await pw.stop()
+
+
+# CDP-подключения по endpoint: [Browser, число ботов на нём]
+_BROWSERS: Dict[str, list] = {}
+_BROWSERS_LOCK = asyncio.Lock()
+
+
+async def connect_browser(playwright, endpoint: str) -> Tuple[Browser, bool]:
+    """Подключиться к браузеру по CDP или взять уже открытое подключение.
+    
+    Второй элемент — True, если бот на этом endpoint первый.
+    """
+    async with _BROWSERS_LOCK:
+        entry = _BROWSERS.get(endpoint)
+        if entry is None or not entry[0].is_connected():
+            entry = _BROWSERS[endpoint] = [await playwright.chromium.connect_over_cdp(endpoint), 0]
+        entry[1] += 1
+        return entry[0], entry[1] == 1
+
+
+async def disconnect_browser(endpoint: str, browser: Browser):
+    """Отпустить подключение; последний бот на endpoint его закрывает"""
+    async with _BROWSERS_LOCK:
+        entry = _BROWSERS.get(endpoint)
+        if entry is None or entry[0] is not browser:
+            # Подключение уже заменено переподключением — закрываем только своё, мёртвое
+            try:
+                await browser.close()
+            except PlaywrightError:
+                pass
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _BROWSERS[endpoint]
+            await entry[0].close()
+
+
+# Тип контента по URL за один проход: reel или p (пост)
+_URL_KIND_RE = re.compile(r"/(reel|p)/")
+
+
+def _disable_playwright_stack_capture():
+    """Не собирать стек Python на каждом API-вызове Playwright.
+    
+    Стек нужен только для отладочных метаданных, а обход кадров
+    занимает заметную долю CPU. PW_INSPECT_STACK=1 — оставить как есть.
+    """
+    if os.getenv("PW_INSPECT_STACK") == "1":
+        return
+    try:
+        from playwright._impl import _connection
+    except ImportError:
+        return
+    if hasattr(_connection, "_capture_stack_trace"):
+        # Словарь новый на каждый вызов — Playwright его дописывает
+        _connection._capture_stack_trace = lambda: {"frames": [], "apiName": "", "title": None}
+
+
 class StealthBot:
     """ Бот с максимальной маскировкой"""
     
+    # Действия при просмотре: верхние границы броска для отвлечения, мыши, скролла; выше — просто смотрим
+    WATCH_ACTION_THRESHOLDS = np.array([0.1, 0.2, 0.25])
+    
+    # Переход внутри SPA: роутер Instagram слушает popstate
+    _SPA_NAV_JS = """(url) => {
+        history.pushState({}, '', url);
+        dispatchEvent(new PopStateEvent('popstate', {state: {}}));
+    }"""
+    
+    # Роутер отрисовал новый пост: canonical / og:url указывают на его путь
+    _SPA_ROUTE_READY_JS = """(path) => [...document.querySelectorAll(
+        'link[rel="canonical"], meta[property="og:url"]'
+    )].some((el) => (el.href || el.content || '').includes(path))"""
+    
+    # Сколько ждать отрисовки маршрута после pushState (мс), потом — обычный goto
+    SPA_ROUTE_TIMEOUT = 5000
+    
+    # Кандидаты для клика: (CSS-селектор, текст внутри или None), по приоритету
+    POPUP_TARGETS = (('button', 'Not Now'), ('button', 'Не сейчас'), ('[aria-label="Close"]', None))
+    LIKE_TARGETS = (('svg[aria-label="Like"]', None), ('svg[aria-label="Нравится"]', None))
+    
+    # Первый видимый кандидат -> центр его прямоугольника, всё за один evaluate
+    # Текст сравнивается как в :has-text — без учёта регистра, пробелы схлопнуты
+    _FIND_TARGET_JS = """(targets) => {
+        const norm = (t) => t.replace(/\\s+/g, ' ').trim().toLowerCase();
+        for (const [css, text] of targets) {
+            const needle = text && norm(text);
+            for (const el of document.querySelectorAll(css)) {
+                if (needle && !norm(el.textContent).includes(needle)) continue;
+                const r = el.getBoundingClientRect();
+                if (r.width && r.height) return [r.x + r.width / 2, r.y + r.height / 2];
+            }
+        }
+        return null;
+    }"""
+    
     def __init__(self, config: StealthConfig = None):
+        _disable_playwright_stack_capture()
         self.config = config or StealthConfig()
         
         if not self.config.token:
@@ -599,15 +990,28 @@ class StealthBot:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._endpoint: Optional[str] = None
+        self._owns_page = False
         
         # Человеческое поведение
-        self.behavior = HumanBehavior()
+        self.rng = np.random.default_rng(self.config.rng_seed)
+        self.behavior = HumanBehavior(self.rng)
         self.mouse: Optional[AdvancedMouseSimulator] = None
         self.scroller: Optional[AdvancedScrollSimulator] = None
         self.human_actions: Optional[HumanActions] = None
         
         self.viewport = {'width': 1280, 'height': 800}
         
+        # Начало сессии по монотонным часам — для лимитов
+        self._session_start_mono: Optional[float] = None
+        
+        # Лог: файл открыт один раз, строки пишет фоновая задача
+        self._ts_epoch = -1
+        self._ts_str = ""
+        self._log_fh = None
+        self._log_q: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
+        
         self.stats = {
             'total': 0,
             'likes': 0,
@@ -625,12 +1029,12 @@ class StealthBot:
         """Загрузить сохранённое состояние"""
         if os.path.exists(self.config.state_file):
             try:
-                with open(self.config.state_file, 'r') as f:
-                    state = json.load(f)
+                with open(self.config.state_file, 'rb') as f:
+                    state = _json_loads(f.read())
                     # Восстанавливаем личность (для консистентности)
                     if 'personality' in state:
                         self.behavior.personality = state['personality']
-            except:
+            except (ValueError, OSError):
                 pass
     
     def _save_state(self):
@@ -640,20 +1044,53 @@ class StealthBot:
             'last_session': datetime.now().isoformat(),
             'stats': self.stats
         }
-        with open(self.config.state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        # Пишем одним вызовом во временный файл и подменяем — файл не бывает битым
+        tmp = self.config.state_file + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(_json_dumps(state, indent=True))
+        os.replace(tmp, self.config.state_file)
     
     def log(self, msg: str):
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        line = f"[{ts}] {msg}"
+        # Строка времени пересчитывается раз в секунду
+        now = int(time.time())
+        if now != self._ts_epoch:
+            self._ts_epoch = now
+            self._ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        line = f"[{self._ts_str}] {msg}"
         print(line)
-        with open(self.config.log_file, 'a', encoding='utf-8') as f:
-            f.write(line + '\n')
+        if self._log_q is not None:
+            self._log_q.put_nowait(line)
+        else:
+            self._write_log_lines([line])
+    
+    def _write_log_lines(self, lines: list):
+        """Дописать строки в лог-файл"""
+        if self._log_fh is None:
+            self._log_fh = open(self.config.log_file, 'a', encoding='utf-8', buffering=64 * 1024)
+        self._log_fh.write('\n'.join(lines) + '\n')
+    
+    async def _log_consumer(self):
+        """Фоновая запись лога пачками (до 256 строк, не чаще раза в секунду)"""
+        while True:
+            lines = [await self._log_q.get()]
+            while len(lines) < 256 and not self._log_q.empty():
+                lines.append(self._log_q.get_nowait())
+            
+            # None — сигнал остановки
+            done = None in lines
+            lines = [line for line in lines if line is not None]
+            if lines:
+                await asyncio.to_thread(self._write_log_lines, lines)
+                await asyncio.to_thread(self._log_fh.flush)
+            if done:
+                return
+            if self._log_q.empty():
+                await asyncio.sleep(1.0)
     
     def _check_session_limits(self) -> bool:
         """Проверить лимиты сессии"""
-        if self.stats['session_start']:
-            duration = (datetime.now() - self.stats['session_start']).total_seconds() / 60
+        if self._session_start_mono is not None:
+            duration = (time.monotonic() - self._session_start_mono) / 60
             if duration >= self.config.max_session_duration_minutes:
                 self.log(f"⏰ Достигнут лимит времени сессии ({duration:.0f} мин)")
                 return False
@@ -671,14 +1108,19 @@ class StealthBot:
     
     async def start(self):
         """Запуск"""
-        self.playwright = await async_playwright().start()
+        self._log_q = asyncio.Queue()
+        self._log_task = asyncio.create_task(self._log_consumer())
+        
+        # Компиляция Numba занимает секунды — в потоке, пока подключаемся к браузеру
+        warmup = asyncio.create_task(asyncio.to_thread(_warmup_numba)) if NUMBA_AVAILABLE else None
+        
+        self.playwright = await get_playwright()
         
         profile_id = self.config.profile_id
         
         if self.config.mode == "cloud":
-            ws_url = self.api.get_cloud_browser_url(profile_id)
+            self._endpoint = self.api.get_cloud_browser_url(profile_id)
             self.log(f"☁️ Облачный браузер...")
-            self.browser = await self.playwright.chromium.connect_over_cdp(ws_url)
         elif GOLOGIN_SDK_AVAILABLE:
             self.log(f"🖥️ Локальный профиль...")
             self.gologin_sdk = GoLogin({
@@ -686,31 +1128,47 @@ class StealthBot:
                 "profile_id": profile_id,
             })
             debugger_address = self.gologin_sdk.start()
-            self.browser = await self.playwright.chromium.connect_over_cdp(f"http://{debugger_address}")
+            self._endpoint = f"http://{debugger_address}"
         else:
-            ws_url = self.api.get_cloud_browser_url(profile_id)
-            self.browser = await self.playwright.chromium.connect_over_cdp(ws_url)
+            self._endpoint = self.api.get_cloud_browser_url(profile_id)
+        
+        self.browser, first = await connect_browser(self.playwright, self._endpoint)
         
+        # Контекст профиля (с его cookies) общий; второй бот на том же браузере берёт свою вкладку
         contexts = self.browser.contexts
         self.context = contexts[0] if contexts else await self.browser.new_context()
-        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        if first and self.context.pages:
+            self.page = self.context.pages[0]
+        else:
+            self.page = await self.context.new_page()
+            self._owns_page = True
         
         # Инициализируем симуляторы
-        self.mouse = AdvancedMouseSimulator(self.page, self.behavior)
-        self.scroller = AdvancedScrollSimulator(self.page, self.behavior)
-        self.human_actions = HumanActions(self.page, self.mouse, self.behavior)
+        self.mouse = AdvancedMouseSimulator(self.page, self.behavior, self.rng)
+        self.scroller = AdvancedScrollSimulator(self.page, self.behavior, self.rng)
+        self.human_actions = HumanActions(self.page, self.mouse, self.behavior, self.scroller, self.rng)
+        if warmup:
+            await warmup
+        
+        # Обработчики в порядке WATCH_ACTION_THRESHOLDS: отвлеклись, подвигали мышь, поскроллили
+        self._watch_handlers = (
+            self.human_actions.maybe_distraction,
+            self.human_actions.idle_movement,
+            self._watch_scroll,
+        )
         
         try:
             vp = await self.page.evaluate('() => ({width: window.innerWidth, height: window.innerHeight})')
             self.viewport = vp
             self.mouse.current_pos = (vp['width'] // 2, vp['height'] // 2)
-        except:
+        except PlaywrightError:
             pass
         
         self.stats['session_start'] = datetime.now()
+        self._session_start_mono = time.monotonic()
         self.log(f"✓ Браузер запущен")
-        self.log(f"   Личность: speed={self.behavior.personality['speed']:.2f}, "
-                f"accuracy={self.behavior.personality['accuracy']:.2f}")
+        self.log(f"   Личность: speed={self.behavior.speed:.2f}, "
+                f"accuracy={self.behavior.accuracy:.2f}")
     
     async def stop(self):
         """Остановка"""
@@ -719,87 +1177,81 @@ class StealthBot:
         if self.gologin_sdk:
             self.gologin_sdk.stop()
         
+        if self._owns_page and self.page:
+            await self.page.close()
+        
         if self.browser:
-            await self.browser.close()
+            await disconnect_browser(self._endpoint, self.browser)
+            self.browser = None
         
         if self.playwright:
-            await self.playwright.stop()
+            await release_playwright()
+            self.playwright = None
+        
+        await self.api.aclose()
         
         self.log("✓ Браузер остановлен")
+        
+        if self._log_task:
+            self._log_q.put_nowait(None)
+            await self._log_task
+            self._log_q = None
+            self._log_task = None
+        
+        if self._log_fh:
+            self._log_fh.close()
+            self._log_fh = None
+    
+    async def _find_click_target(self, targets) -> Optional[Tuple[int, int]]:
+        """Точка клика по первому видимому кандидату (один запрос к странице)"""
+        point = await self.page.evaluate(self._FIND_TARGET_JS, targets)
+        return (int(point[0]), int(point[1])) if point else None
     
     async def dismiss_popups(self):
         """Закрыть попапы"""
-        selectors = [
-            'button:has-text("Not Now")',
-            'button:has-text("Не сейчас")',
-            '[aria-label="Close"]',
-        ]
-        
-        for sel in selectors:
-            try:
-                btn = await self.page.query_selector(sel)
-                if btn and await btn.is_visible():
-                    box = await btn.bounding_box()
-                    if box:
-                        await self.mouse.click_at((
-                            int(box['x'] + box['width']/2),
-                            int(box['y'] + box['height']/2)
-                        ))
-                        await asyncio.sleep(0.5)
-            except:
-                pass
+        try:
+            target = await self._find_click_target(self.POPUP_TARGETS)
+            if target:
+                await self.mouse.click_at(target)
+                await asyncio.sleep(0.5)
+        except (PlaywrightError, asyncio.TimeoutError):
+            pass
     
     async def like_content(self) -> bool:
         """Лайкнуть с человеческим поведением"""
         
         # Не лайкаем всё подряд
-        if random.random() > self.config.like_probability:
+        if self.behavior.uniform() > self.config.like_probability:
             self.log("  💭 Не буду лайкать это")
             return False
         
         # Иногда колеблемся
-        if random.random() < 0.2:
+        if self.behavior.uniform() < 0.2:
             await self.human_actions.hesitate()
         
         # Двойной тап или кнопка
-        if random.random() < 0.6:
+        if self.behavior.uniform() < 0.6:
             self.log("  ❤️ Двойной тап")
             center = (self.viewport['width'] // 2, self.viewport['height'] // 2)
             target = (
-                center[0] + random.randint(-80, 80),
-                center[1] + random.randint(-80, 80)
+                center[0] + self.behavior.randint(-80, 80),
+                center[1] + self.behavior.randint(-80, 80)
             )
             
-            await self.mouse.click_at(target)
-            await asyncio.sleep(random.uniform(0.08, 0.15))
-            await self.mouse.click_at((
-                target[0] + random.randint(-5, 5),
-                target[1] + random.randint(-5, 5)
-            ))
+            await self.mouse.double_click_at(target)
             
             await asyncio.sleep(0.5)
             return True
         
         # Кнопка лайка
-        like_selectors = [
-            'svg[aria-label="Like"]',
-            'svg[aria-label="Нравится"]',
-        ]
-        
-        for sel in like_selectors:
-            try:
-                btn = await self.page.query_selector(sel)
-                if btn:
-                    box = await btn.bounding_box()
-                    if box:
-                        self.log("  ❤️ Кнопка лайка")
-                        await self.mouse.click_at((
-                            int(box['x'] + box['width']/2),
-                            int(box['y'] + box['height']/2)
-                        ))
-                        return True
-            except:
-                continue
+        try:
+            target = await self._find_click_target(self.LIKE_TARGETS)
+            if target:
+                self.log("  ❤️ Кнопка лайка")
+                await self.mouse.click_at(target)
+                return True
+        except (PlaywrightError, asyncio.TimeoutError):
+            pass
         
         return False
     
@@ -812,28 +1264,60 @@ class StealthBot:
         
         self.log(f"  👀 Смотрю {watch_time:.1f} сек")
         
-        elapsed = 0
-        while elapsed < watch_time:
-            # Обновляем усталость
-            self.behavior.update_fatigue()
-            
-            # Сколько ждать до следующего "события"
-            wait = random.uniform(2, 5)
-            await asyncio.sleep(min(wait, watch_time - elapsed))
-            elapsed += wait
-            
-            # Случайные действия во время просмотра
-            action_roll = random.random()
+        # Расписание целиком: паузы по 2-5 сек до конца просмотра (последняя обрезана)
+        ends = np.cumsum(self.rng.uniform(2, 5, int(watch_time // 2) + 1))
+        n = int(np.searchsorted(ends, watch_time)) + 1
+        waits = np.diff(np.minimum(ends[:n], watch_time), prepend=0.0)
+        
+        # Случайные действия после пауз — индекс в таблице обработчиков (len — ничего)
+        handlers = self._watch_handlers
+        actions = np.searchsorted(self.WATCH_ACTION_THRESHOLDS, self.rng.random(n), side='right')
+        
+        # Паузы без действий между собой склеиваются в один sleep
+        pending = 0.0
+        steps = 0
+        for wait, action in zip(waits.tolist(), actions.tolist()):
+            pending += wait
+            steps += 1
+            if action == len(handlers):
+                continue
             
-            if action_roll < 0.1:
-                # Отвлеклись
-                await self.human_actions.maybe_distraction()
-            elif action_roll < 0.2:
-                # Подвигали мышь
-                await self.human_actions.idle_movement()
-            elif action_roll < 0.25:
-                # Поскроллили немного
-                await self.scroller.scroll('down', random.randint(50, 150))
+            # Усталость — одним вызовом за все склеенные паузы
+            self.behavior.update_fatigue(steps)
+            await asyncio.sleep(pending)
+            pending = 0.0
+            steps = 0
+            await handlers[action]()
+        
+        if steps:
+            self.behavior.update_fatigue(steps)
+            await asyncio.sleep(pending)
+    
+    async def _watch_scroll(self):
+        """Поскроллить немного во время просмотра"""
+        await self.scroller.scroll('down', self.behavior.randint(50, 150))
+    
+    async def _open(self, url: str):
+        """Открыть URL: на том же хосте — через History API (если включено), иначе goto"""
+        target = urlparse(url)
+        if self.config.spa_navigation and urlparse(self.page.url).netloc == target.netloc:
+            await self.page.evaluate(self._SPA_NAV_JS, url)
+            try:
+                await self.page.wait_for_function(
+                    self._SPA_ROUTE_READY_JS, arg=target.path, timeout=self.SPA_ROUTE_TIMEOUT
+                )
+                return
+            except PlaywrightError:
+                self.log("  ↪ SPA-переход не отрисовался — загружаю страницу")
+        # Ждём только commit — DOM догружается во время паузы в _settle
+        await self.page.goto(url, wait_until='commit', timeout=30000)
+    
+    async def _settle(self, delay: float):
+        """Человеческая пауза после перехода; загрузка DOM идёт параллельно"""
+        await asyncio.gather(
+            asyncio.sleep(delay),
+            self.page.wait_for_load_state('domcontentloaded', timeout=30000),
+        )
     
     async def process_reel(self, url: str) -> bool:
         """Обработать Reels"""
@@ -848,14 +1332,14 @@ class StealthBot:
             self.log(f"🎬 Reels #{self.stats['total']} (усталость: {self.behavior.fatigue:.0%})")
             self.log(f"   {url}")
             
-            await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            await self._open(url)
             
             # Ждём загрузки (человек не сразу начинает)
-            await asyncio.sleep(self.behavior.get_adjusted_delay(1.5, 3))
+            await self._settle(self.behavior.get_adjusted_delay(1.5, 3))
             await self.dismiss_popups()
             
             # Осматриваемся
-            if random.random() < 0.3:
+            if self.behavior.uniform() < 0.3:
                 await self.human_actions.look_around()
             
             # Смотрим
@@ -890,17 +1374,17 @@ class StealthBot:
             self.log(f"📷 Пост #{self.stats['total']}")
             self.log(f"   {url}")
             
-            await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            await asyncio.sleep(self.behavior.get_adjusted_delay(1, 2.5))
+            await self._open(url)
+            await self._settle(self.behavior.get_adjusted_delay(1, 2.5))
             await self.dismiss_popups()
             
             # Читаем/смотрим
             await self.watch_content(self.config.post_watch_min, self.config.post_watch_max)
             
             # Иногда скроллим к комментариям
-            if random.random() < 0.3:
-                await self.scroller.scroll('down', random.randint(200, 400))
-                await self.human_actions.read_content(random.uniform(1, 3))
+            if self.behavior.uniform() < 0.3:
+                await self.scroller.scroll('down', self.behavior.randint(200, 400))
+                await self.human_actions.read_content(self.behavior.uniform(1, 3))
             
             # Лайк
             if self.config.auto_like:
@@ -919,13 +1403,13 @@ class StealthBot:
         """Обработать URL"""
         url = url.strip()
         
-        if '/reel/' in url:
-            return await self.process_reel(url)
-        elif '/p/' in url:
-            return await self.process_post(url)
-        else:
+        m = _URL_KIND_RE.search(url)
+        if not m:
             self.log(f"⚠️ Неизвестный URL: {url}")
             return False
+        
+        handler = self.process_reel if m.group(1) == 'reel' else self.process_post
+        return await handler(url)
     
     async def process_urls(self, urls: list[str]):
         """Обработать список URL"""
@@ -941,14 +1425,18 @@ class StealthBot:
             
             await self.process_url(url)
             
+            # Промежуточное сохранение на случай падения
+            if (i + 1) % self.config.state_checkpoint_every == 0:
+                self._save_state()
+            
             if i < len(urls) - 1:
                 # Пауза между URL (с учётом усталости)
-                base_delay = random.uniform(15, 45)
+                base_delay = self.behavior.uniform(15, 45)
                 delay = base_delay * (1 + self.behavior.fatigue * 0.5)
                 
                 # Иногда длинная пауза (перерыв)
-                if random.random() < 0.1:
-                    delay *= random.uniform(2, 4)
+                if self.behavior.uniform() < 0.1:
+                    delay *= self.behavior.uniform(2, 4)
                     self.log(f"  ☕ Перерыв {delay:.0f} сек...")
                 else:
                     self.log(f"  ⏳ Пауза {delay:.0f} сек...")
@@ -964,8 +1452,8 @@ class StealthBot:
         self.log(f"   Лайков: {self.stats['likes']}")
         self.log(f"   Ошибок: {self.stats['errors']}")
         self.log(f"   Усталость: {self.behavior.fatigue:.0%}")
-        if self.stats['session_start']:
-            duration = datetime.now() - self.stats['session_start']
+        if self._session_start_mono is not None:
+            duration = timedelta(seconds=round(time.monotonic() - self._session_start_mono))
             self.log(f"   Время: {duration}")
 
 
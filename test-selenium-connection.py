@@ -43,30 +43,36 @@ def test_grid_status():
 
     return True
 
-def test_browser_session():
-    """Create a browser session and navigate to YouTube"""
+def create_driver():
+    """Create one remote WebDriver shared by all browser tests"""
     print("\n" + "=" * 60)
     print("Testing Browser Session Creation...")
     print("=" * 60)
 
-    driver = None
-    try:
-        # Configure Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--headless")  # Run in headless mode for testing
+    # Configure Chrome options
+    chrome_options = Options()
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--headless")  # Run in headless mode for testing
 
+    try:
         print("[...] Creating WebDriver instance...")
         driver = webdriver.Remote(
             command_executor='http://localhost:4444/wd/hub',
             options=chrome_options
         )
+    except Exception as e:
+        print(f"[FAIL] Failed to create WebDriver: {e}")
+        return None
 
-        print("[OK] WebDriver created successfully")
+    print("[OK] WebDriver created successfully")
+    return driver
 
+def test_browser_session(driver):
+    """Navigate to YouTube in the shared browser session"""
+    try:
         print("[...] Navigating to YouTube...")
         driver.get("https://www.youtube.com")
 
@@ -89,31 +95,13 @@ def test_browser_session():
         print(f"[FAIL] Browser session test failed: {e}")
         return False
 
-    finally:
-        if driver:
-            print("[...] Closing browser session...")
-            driver.quit()
-            print("[OK] Browser session closed")
-
-def test_clip_button_availability():
+def test_clip_button_availability(driver):
     """Test if clip functionality is accessible"""
     print("\n" + "=" * 60)
     print("Testing Clip Button Availability...")
     print("=" * 60)
 
-    driver = None
     try:
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--headless")
-
-        driver = webdriver.Remote(
-            command_executor='http://localhost:4444/wd/hub',
-            options=chrome_options
-        )
-
         # Navigate to a sample YouTube video
         test_video = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
         print(f"[...] Navigating to test video: {test_video}")
@@ -136,10 +124,6 @@ def test_clip_button_availability():
         print(f"[FAIL] Clip button test failed: {e}")
         return False
 
-    finally:
-        if driver:
-            driver.quit()
-
 def main():
     print("\n" + "SELENIUM GRID CONNECTION TEST" + "\n")
 
@@ -148,11 +132,22 @@ def main():
     # Test 1: Grid Status
     results.append(("Grid Status", test_grid_status()))
 
-    # Test 2: Browser Session
-    results.append(("Browser Session", test_browser_session()))
+    # Tests 2-3 share one browser session instead of starting Chrome twice
+    driver = create_driver()
+    if driver:
+        try:
+            # Test 2: Browser Session
+            results.append(("Browser Session", test_browser_session(driver)))
 
-    # Test 3: Clip Button
-    results.append(("Clip Functionality", test_clip_button_availability()))
+            # Test 3: Clip Button
+            results.append(("Clip Functionality", test_clip_button_availability(driver)))
+        finally:
+            print("[...] Closing browser session...")
+            driver.quit()
+            print("[OK] Browser session closed")
+    else:
+        results.append(("Browser Session", False))
+        results.append(("Clip Functionality", False))
 
     # Summary
     print("\n" + "=" * 60)